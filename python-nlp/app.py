@@ -1,42 +1,414 @@
 from flask import Flask, request, jsonify
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from concurrent.futures import Future, ThreadPoolExecutor
+from cachetools import LRUCache
 import torch
 import torch.nn.functional as F
+import transformers
+import hashlib
 import logging
+import os
+import queue
+import re
+import shutil
+import threading
+import time
 
 app = Flask(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# "torch" runs the models eagerly, "torchscript" traces and freezes them,
+# "onnx" serves them through ONNX Runtime
+INFERENCE_BACKENDS = ("torch", "torchscript", "onnx")
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "torch")
+if INFERENCE_BACKEND not in INFERENCE_BACKENDS:
+    raise ValueError(
+        f"Unknown INFERENCE_BACKEND {INFERENCE_BACKEND!r}, "
+        f"expected one of {', '.join(INFERENCE_BACKENDS)}"
+    )
+
+# Quantized and exported models are cached here so restarts skip the conversion
+MODEL_CACHE_DIR = os.environ.get(
+    "MODEL_CACHE_DIR", os.path.join(os.path.dirname(__file__), "model_cache")
+)
+
+# Intra-op threads per forward pass; gunicorn.conf.py splits the cores between
+# workers and the ensemble models they run concurrently
+if "TORCH_THREADS" in os.environ:
+    torch.set_num_threads(int(os.environ["TORCH_THREADS"]))
+torch.set_num_interop_threads(1)
+
+# Longer request texts are rejected; the models only see the first 512 tokens
+MAX_TEXT_LENGTH = 100_000
+
+# Order of the probabilities returned by every endpoint
+SENTIMENT_LABELS = ["positive", "negative", "neutral"]
+
+# Setup device
+device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# ONNX Runtime only runs on the GPU when onnxruntime-gpu is installed
+if INFERENCE_BACKEND == "onnx" and device.type == "cuda":
+    import onnxruntime
+
+    if "CUDAExecutionProvider" not in onnxruntime.get_available_providers():
+        logging.warning(
+            "CUDAExecutionProvider unavailable, install onnxruntime-gpu to run "
+            "the ONNX backend on GPU; falling back to CPU"
+        )
+        device = torch.device("cpu")
+
+# Route INT8 matmuls through the best available backend (VNNI on x86)
+for engine in ("fbgemm", "qnnpack"):
+    if engine in torch.backends.quantized.supported_engines:
+        torch.backends.quantized.engine = engine
+        break
+
+
+def load_model(model_id):
+    """
+    Load a sequence classification model for inference
+    On CPU the Linear layers are dynamically quantized to INT8, on GPU the
+    weights are cast to FP16
+    """
+    if INFERENCE_BACKEND == "onnx":
+        return load_onnx_model(model_id)
+
+    if device.type != "cpu":
+        # FP16 weights halve memory traffic and run on tensor cores
+        model = AutoModelForSequenceClassification.from_pretrained(model_id)
+        model.to(device, dtype=torch.float16)
+        model.eval()
+        return model
+
+    # Pickled quantized modules are tied to the library versions that wrote them
+    cache_path = os.path.join(
+        MODEL_CACHE_DIR,
+        f"{cache_name(model_id)}.torch-{torch.__version__}"
+        f".transformers-{transformers.__version__}.int8.pt",
+    )
+    if os.path.exists(cache_path):
+        logging.info(f"Loading quantized {model_id} from {cache_path}")
+        try:
+            return torch.load(cache_path)
+        except Exception as e:
+            logging.warning(
+                f"Could not load cached {model_id}, re-quantizing: {str(e)}"
+            )
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_id)
+    model.eval()
+    model = torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+    # Write to a temporary file first so a crash never leaves a partial cache
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+        torch.save(model, tmp_path)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logging.warning(f"Could not cache quantized {model_id}: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return model
+
+
+def load_onnx_model(model_id):
+    """
+    Export a model to ONNX Runtime with transformer-specific graph fusions
+    The optimized graph is cached so later starts skip the export
+    """
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTOptimizer
+    from optimum.onnxruntime.configuration import OptimizationConfig
+    from optimum.version import __version__ as optimum_version
+
+    # CPU and GPU exports are optimized differently, and exported graphs are tied
+    # to the optimum and onnxruntime versions that wrote them
+    onnx_dir = os.path.join(
+        MODEL_CACHE_DIR,
+        f"{cache_name(model_id)}.{device.type}.optimum-{optimum_version}"
+        f".onnxruntime-{onnxruntime.__version__}.onnx",
+    )
+    if not os.path.exists(os.path.join(onnx_dir, "model_optimized.onnx")):
+        logging.info(f"Exporting {model_id} to ONNX")
+        model = ORTModelForSequenceClassification.from_pretrained(model_id, export=True)
+        optimizer = ORTOptimizer.from_pretrained(model)
+
+        # Export to a temporary directory first so a crash never leaves a
+        # partial cache behind under the final name
+        tmp_dir = f"{onnx_dir}.{os.getpid()}.tmp"
+        optimizer.optimize(
+            save_dir=tmp_dir,
+            optimization_config=OptimizationConfig(
+                optimization_level=99,
+                optimize_for_gpu=device.type == "cuda",
+                enable_transformers_specific_optimizations=True,
+            ),
+        )
+        try:
+            os.replace(tmp_dir, onnx_dir)
+        except OSError:
+            # Another worker finished the same export first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    # ORT sizes its thread pool to every core unless told otherwise
+    session_options = onnxruntime.SessionOptions()
+    session_options.intra_op_num_threads = torch.get_num_threads()
+    session_options.inter_op_num_threads = 1
+
+    provider = (
+        "CUDAExecutionProvider" if device.type == "cuda" else "CPUExecutionProvider"
+    )
+    return ORTModelForSequenceClassification.from_pretrained(
+        onnx_dir,
+        file_name="model_optimized.onnx",
+        provider=provider,
+        session_options=session_options,
+    )
+
+
+def trace_model(model, tokenizer):
+    """
+    Compile a model with TorchScript, freezing weights and folding constants
+    Runs two warm-up passes so the first request doesn't pay for compilation
+    """
+    # Return plain tuples instead of ModelOutput so the graph can be traced
+    model.config.torchscript = True
+
+    example = tokenizer(
+        "warmup", return_tensors="pt", padding="max_length", max_length=128
+    ).to(device)
+    example_inputs = (example["input_ids"], example["attention_mask"])
+
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example_inputs, strict=False)
+        traced = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+        for _ in range(2):
+            traced(*example_inputs)
+
+    return traced
+
+
+def capture_graphs(model, tokenizer):
+    """
+    Capture one batch-size-1 CUDA graph per sequence length bucket
+    Replaying a graph launches the whole forward pass without per-kernel overhead
+    """
+    graphs = {}
+
+    for length in GRAPH_BUCKETS:
+        example = tokenizer(
+            "warmup", return_tensors="pt", padding="max_length", max_length=length
+        ).to(device)
+        static_inputs = {
+            "input_ids": example["input_ids"],
+            "attention_mask": example["attention_mask"],
+        }
+
+        # Warm up on a side stream so capture doesn't record lazy initialization
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.no_grad(), torch.cuda.stream(stream):
+            for _ in range(3):
+                model_logits(model, static_inputs)
+        torch.cuda.current_stream().wait_stream(stream)
+
+        graph = torch.cuda.CUDAGraph()
+        with torch.no_grad(), torch.cuda.graph(graph):
+            static_logits = model_logits(model, static_inputs)
+
+        graphs[length] = (graph, static_inputs, static_logits)
+
+    return graphs
+
+
+def to_device(inputs):
+    """
+    Move tokenizer output to the inference device
+    On CUDA the copy comes from pinned memory so it doesn't block the host
+    """
+    if device.type != "cuda":
+        return inputs
+    return {
+        key: value.pin_memory().to(device, non_blocking=True)
+        for key, value in inputs.items()
+    }
+
+
+def model_logits(model, inputs):
+    """Run a forward pass and return FP32 logits for any inference backend"""
+    if isinstance(model, torch.jit.ScriptModule):
+        logits = model(inputs["input_ids"], inputs["attention_mask"])[0]
+    else:
+        logits = model(**inputs).logits
+    return logits.float()
+
+
+def label_order(config):
+    """
+    Index tensor that reorders a model's outputs into SENTIMENT_LABELS order
+    Each model lists its labels differently, so this comes from its config
+    """
+    label_ids = {label.lower(): int(idx) for idx, label in config.id2label.items()}
+    return torch.tensor([label_ids[label] for label in SENTIMENT_LABELS], device=device)
+
+
+def cache_name(model_id):
+    """Filesystem-safe name for a Hugging Face model id"""
+    return model_id.replace("/", "--")
+
+
 # Load multiple models for ensemble
 models = {
     "finbert": {
-        "tokenizer": AutoTokenizer.from_pretrained("ProsusAI/finbert"),
-        "model": AutoModelForSequenceClassification.from_pretrained("ProsusAI/finbert"),
+        "tokenizer": AutoTokenizer.from_pretrained("ProsusAI/finbert", use_fast=True),
+        "model": load_model("ProsusAI/finbert"),
     },
     "distilroberta": {
         "tokenizer": AutoTokenizer.from_pretrained(
-            "mrm8488/distilroberta-finetuned-financial-news-sentiment-analysis"
+            "mrm8488/distilroberta-finetuned-financial-news-sentiment-analysis",
+            use_fast=True,
         ),
-        "model": AutoModelForSequenceClassification.from_pretrained(
+        "model": load_model(
             "mrm8488/distilroberta-finetuned-financial-news-sentiment-analysis"
         ),
     },
 }
 
-# Setup device and move models
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 for model_name, model_dict in models.items():
-    model_dict["model"].to(device)
-    model_dict["model"].eval()
-    logging.info(f"Loaded {model_name} on {device}")
+    # Read the label order before tracing, traced modules have no config
+    model_dict["label_order"] = label_order(model_dict["model"].config)
+    if INFERENCE_BACKEND == "torchscript":
+        model_dict["model"] = trace_model(model_dict["model"], model_dict["tokenizer"])
+    logging.info(f"Loaded {model_name} on {device} ({INFERENCE_BACKEND})")
 
 logging.info("All models loaded successfully")
 
+# /analyze_single pads to the smallest bucket that fits and replays its graph
+GRAPH_BUCKETS = [64, 128, 256, 512]
+
+finbert_graphs = {}
+graph_lock = threading.Lock()
+
+if device.type == "cuda" and INFERENCE_BACKEND != "onnx":
+    finbert_graphs = capture_graphs(
+        models["finbert"]["model"], models["finbert"]["tokenizer"]
+    )
+    logging.info(f"Captured FinBERT CUDA graphs for lengths {GRAPH_BUCKETS}")
+
+# Batched GPU inference uses BetterTransformer's fused attention, which packs
+# padded batches into nested tensors so pad positions cost no attention compute
+if device.type == "cuda" and INFERENCE_BACKEND == "torch":
+    from optimum.bettertransformer import BetterTransformer
+
+    for model_name, model_dict in models.items():
+        # The CUDA graphs point at the original FinBERT weights, keep them alive
+        keep_original = model_name == "finbert" and bool(finbert_graphs)
+        if keep_original:
+            model_dict["graph_model"] = model_dict["model"]
+        model_dict["model"] = BetterTransformer.transform(
+            model_dict["model"], keep_original_model=keep_original
+        )
+        logging.info(f"Converted {model_name} to BetterTransformer")
+
+# Ensemble models run side by side: on separate CUDA streams on GPU, otherwise
+# on separate threads since the inference kernels release the GIL. Every
+# executor forward gets its own TORCH_THREADS team, so at most len(models)
+# teams run per process
+if device.type == "cuda":
+    for model_dict in models.values():
+        model_dict["stream"] = torch.cuda.Stream()
+
+model_executor = ThreadPoolExecutor(
+    max_workers=len(models), thread_name_prefix="ensemble"
+)
+
+# Micro-batching: concurrent requests are queued and run through the models
+# together instead of one forward pass per request
+MAX_BATCH_SIZE = 16
+MAX_WAIT_MS = 5
+
+batch_queue = queue.Queue()
+batch_lock = threading.Lock()
+batch_worker_pid = None
+batch_worker_start_lock = threading.Lock()
+
+# Finished sentiments keyed by a digest of the text, so repeated texts skip the
+# models entirely without the cache holding on to every text
+SENTIMENT_CACHE_SIZE = 8192
+
+ensemble_cache = LRUCache(maxsize=SENTIMENT_CACHE_SIZE)
+finbert_cache = LRUCache(maxsize=SENTIMENT_CACHE_SIZE)
+sentiment_cache_lock = threading.Lock()
+
+# Tokenized texts, keyed the same way so long texts aren't kept around
+encoding_cache = LRUCache(maxsize=4096)
+encoding_cache_lock = threading.Lock()
+
+
+# Aspect keywords for /analyze_aspects
+ASPECT_KEYWORDS = {
+    "earnings": [
+        "earnings",
+        "revenue",
+        "profit",
+        "income",
+        "sales",
+        "quarterly results",
+    ],
+    "leadership": [
+        "CEO",
+        "executive",
+        "management",
+        "leadership",
+        "founder",
+        "board",
+    ],
+    "product": [
+        "product",
+        "service",
+        "innovation",
+        "technology",
+        "launch",
+        "release",
+    ],
+    "competition": [
+        "competitor",
+        "market share",
+        "competition",
+        "rival",
+        "competitive",
+    ],
+    "regulation": [
+        "regulation",
+        "lawsuit",
+        "regulatory",
+        "legal",
+        "compliance",
+        "antitrust",
+    ],
+}
+
+# One case-insensitive alternation per aspect, compiled once at startup
+ASPECT_PATTERNS = {
+    aspect_name: re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)
+    for aspect_name, keywords in ASPECT_KEYWORDS.items()
+}
+
 
 @app.route("/health", methods=["GET"])
 def health():
     return jsonify(
-        {"status": "healthy", "models": list(models.keys()), "device": str(device)}
+        {
+            "status": "healthy",
+            "models": list(models.keys()),
+            "device": str(device),
+            "backend": INFERENCE_BACKEND,
+        }
     )
 
 
@@ -52,7 +424,13 @@ def analyze():
         if not data or "text" not in data:
             return jsonify({"error": "Missing 'text' field"}), 400
 
-        text = data["text"][:512]
+        text = data["text"]
+
+        if len(text) > MAX_TEXT_LENGTH:
+            return (
+                jsonify({"error": f"Text exceeds {MAX_TEXT_LENGTH} characters"}),
+                413,
+            )
 
         if not text.strip():
             return jsonify({"error": "Empty text"}), 400
@@ -82,81 +460,45 @@ def analyze_aspects():
 
         text = data["text"]
 
+        if len(text) > MAX_TEXT_LENGTH:
+            return (
+                jsonify({"error": f"Text exceeds {MAX_TEXT_LENGTH} characters"}),
+                413,
+            )
+
         if not text.strip():
             return jsonify({"error": "Empty text"}), 400
 
-        # Define aspect keywords
-        aspects = {
-            "earnings": [
-                "earnings",
-                "revenue",
-                "profit",
-                "income",
-                "sales",
-                "quarterly results",
-            ],
-            "leadership": [
-                "CEO",
-                "executive",
-                "management",
-                "leadership",
-                "founder",
-                "board",
-            ],
-            "product": [
-                "product",
-                "service",
-                "innovation",
-                "technology",
-                "launch",
-                "release",
-            ],
-            "competition": [
-                "competitor",
-                "market share",
-                "competition",
-                "rival",
-                "competitive",
-            ],
-            "regulation": [
-                "regulation",
-                "lawsuit",
-                "regulatory",
-                "legal",
-                "compliance",
-                "antitrust",
-            ],
-        }
+        # Bucket each sentence into every aspect it mentions in a single pass
+        relevant_sentences = {aspect_name: [] for aspect_name in ASPECT_PATTERNS}
+        for sentence in text.split("."):
+            for aspect_name, pattern in ASPECT_PATTERNS.items():
+                if pattern.search(sentence):
+                    relevant_sentences[aspect_name].append(sentence.strip())
 
         aspect_sentiments = {}
+        aspect_texts = []
 
-        for aspect_name, keywords in aspects.items():
-            # Find sentences mentioning this aspect
-            sentences = text.split(".")
-            relevant_sentences = []
-
-            for sentence in sentences:
-                sentence_lower = sentence.lower()
-                if any(keyword in sentence_lower for keyword in keywords):
-                    relevant_sentences.append(sentence.strip())
-
-            if relevant_sentences:
-                # Analyze sentiment of relevant sentences using ensemble
-                combined = ". ".join(relevant_sentences)
-                sentiment = analyze_text_sentiment_ensemble(combined[:512])
+        for aspect_name, sentences in relevant_sentences.items():
+            if sentences:
+                # Collect relevant sentences so every aspect is analyzed in one batch
+                combined = ". ".join(sentences)
+                aspect_texts.append(combined)
                 aspect_sentiments[aspect_name] = {
-                    "sentiment": sentiment,
-                    "mentions": len(relevant_sentences),
-                    "sample": relevant_sentences[0][:100] + "..."
-                    if len(relevant_sentences[0]) > 100
-                    else relevant_sentences[0],
+                    "mentions": len(sentences),
+                    "sample": sentences[0][:100] + "..."
+                    if len(sentences[0]) > 100
+                    else sentences[0],
                 }
-                logging.info(
-                    f"Aspect '{aspect_name}': {len(relevant_sentences)} mentions found"
-                )
+                logging.info(f"Aspect '{aspect_name}': {len(sentences)} mentions found")
+
+        # Overall text and all aspects share a single ensemble pass
+        sentiments = analyze_texts_ensemble([text] + aspect_texts)
+        for aspect, sentiment in zip(aspect_sentiments.values(), sentiments[1:]):
+            aspect["sentiment"] = sentiment
 
         result = {
-            "overall": analyze_text_sentiment_ensemble(text[:512]),
+            "overall": sentiments[0],
             "aspects": aspect_sentiments,
             "aspects_found": len(aspect_sentiments),
         }
@@ -173,63 +515,222 @@ def analyze_text_sentiment_ensemble(text):
     Core sentiment analysis using ensemble of models
     Returns averaged probabilities across all models
     """
-    if not text or not text.strip():
-        return {"positive": 0.33, "negative": 0.33, "neutral": 0.34, "confidence": 0.0}
+    return analyze_texts_ensemble([text])[0]
 
-    ensemble_positive = 0.0
-    ensemble_negative = 0.0
-    ensemble_neutral = 0.0
-    max_confidence = 0.0
 
-    for model_name, model_dict in models.items():
-        try:
-            tokenizer = model_dict["tokenizer"]
-            model = model_dict["model"]
+def analyze_texts_ensemble(texts):
+    """
+    Ensemble sentiment analysis for several texts
+    Queues them together so the batch worker runs them in one forward pass
+    """
+    ensure_batch_worker()
+
+    futures = []
+    for text in texts:
+        future = Future()
+        if not text or not text.strip():
+            future.set_result(
+                {"positive": 0.33, "negative": 0.33, "neutral": 0.34, "confidence": 0.0}
+            )
+        else:
+            with sentiment_cache_lock:
+                cached = ensemble_cache.get(text_key(text))
+            if cached is not None:
+                future.set_result(cached)
+            else:
+                batch_queue.put((text, future))
+        futures.append(future)
 
-            inputs = tokenizer(
-                text, return_tensors="pt", truncation=True, max_length=512, padding=True
-            ).to(device)
+    return [future.result() for future in futures]
 
-            with torch.no_grad():
-                outputs = model(**inputs)
-                probabilities = F.softmax(outputs.logits, dim=1)[0]
 
-            # Accumulate predictions
-            # Note: Different models may have different label orders
-            # FinBERT: [positive, negative, neutral]
-            # DistilRoBERTa: [negative, neutral, positive] - need to check
+def text_key(text):
+    """Compact, fixed-size cache key for a text"""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
 
-            # For safety, we'll use the model config to determine order
-            pos_idx = 0  # Assume positive is first
-            neg_idx = 1  # Assume negative is second
-            neu_idx = 2  # Assume neutral is third
 
-            ensemble_positive += float(probabilities[pos_idx])
-            ensemble_negative += float(probabilities[neg_idx])
-            ensemble_neutral += float(probabilities[neu_idx])
+def encode(model_name, text):
+    """
+    Token ids for a text, cached per model since each has its own vocabulary
+    Callers pad the cached encodings into batches with tokenizer.pad
+    """
+    key = (model_name, text_key(text))
+    with encoding_cache_lock:
+        encoding = encoding_cache.get(key)
 
-            # Track max confidence
-            max_confidence = max(max_confidence, float(probabilities.max()))
+    if encoding is None:
+        # The tokenizer truncates to the models' 512 token limit
+        tokenizer = models[model_name]["tokenizer"]
+        encoding = dict(tokenizer(text, truncation=True, max_length=512))
+        with encoding_cache_lock:
+            encoding_cache[key] = encoding
 
-            logging.debug(
-                f"{model_name}: pos={probabilities[pos_idx]:.3f}, neg={probabilities[neg_idx]:.3f}, neu={probabilities[neu_idx]:.3f}"
-            )
+    return encoding
+
+
+def model_probabilities(model_name, texts):
+    """
+    Probabilities from one model for a batch, in SENTIMENT_LABELS order
+    """
+    model_dict = models[model_name]
+    tokenizer = model_dict["tokenizer"]
+    model = model_dict["model"]
+
+    inputs = to_device(
+        tokenizer.pad(
+            [encode(model_name, text) for text in texts],
+            padding=True,
+            return_tensors="pt",
+        )
+    )
+
+    with torch.inference_mode():
+        logits = model_logits(model, inputs)
+        return F.softmax(logits, dim=1).index_select(1, model_dict["label_order"])
+
+
+def run_models(texts):
+    """
+    Run every ensemble model on a batch at the same time
+    On GPU each model gets its own CUDA stream, otherwise its own thread
+    Models that fail are logged and left out of the results
+    """
+    results = {}
+
+    if device.type == "cuda" and INFERENCE_BACKEND != "onnx":
+        current_stream = torch.cuda.current_stream()
+        for model_name, model_dict in models.items():
+            stream = model_dict["stream"]
+            stream.wait_stream(current_stream)
+            try:
+                with torch.cuda.stream(stream):
+                    results[model_name] = model_probabilities(model_name, texts)
+            except Exception as e:
+                logging.error(f"Error with {model_name}: {str(e)}")
+
+        for model_dict in models.values():
+            current_stream.wait_stream(model_dict["stream"])
+    else:
+        futures = {
+            model_name: model_executor.submit(model_probabilities, model_name, texts)
+            for model_name in models
+        }
+        for model_name, future in futures.items():
+            try:
+                results[model_name] = future.result()
+            except Exception as e:
+                logging.error(f"Error with {model_name}: {str(e)}")
+
+    return results
+
+
+def analyze_batch(texts):
+    """
+    Ensemble sentiment analysis for a batch of texts
+    Runs one padded forward pass per model and returns averaged probabilities,
+    plus whether every model contributed to them
+    """
+    # Identical texts in a batch only need to go through the models once
+    unique_texts = list(dict.fromkeys(texts))
+    if len(unique_texts) < len(texts):
+        unique_results, complete = analyze_batch(unique_texts)
+        results = dict(zip(unique_texts, unique_results))
+        return [results[text] for text in texts], complete
+
+    model_results = run_models(texts)
+    if not model_results:
+        raise RuntimeError("All models failed")
+
+    # Running sums stay on the device until every model has contributed
+    ensemble_probabilities = torch.zeros(len(texts), 3, device=device)
+    max_confidence = torch.zeros(len(texts), device=device)
+
+    for model_name, probabilities in model_results.items():
+        # Accumulate predictions in [positive, negative, neutral] order
+        ensemble_probabilities += probabilities
+        max_confidence = torch.maximum(max_confidence, probabilities.max(dim=1).values)
+
+    # Average across the models that returned results
+    num_models = len(model_results)
+    ensemble_probabilities = (ensemble_probabilities / num_models).cpu().tolist()
+    max_confidence = (max_confidence / num_models).cpu().tolist()
+
+    results = [
+        {
+            "positive": positive,
+            "negative": negative,
+            "neutral": neutral,
+            "confidence": confidence,
+        }
+        for (positive, negative, neutral), confidence in zip(
+            ensemble_probabilities, max_confidence
+        )
+    ]
+    return results, num_models == len(models)
+
+
+def drain_batch():
+    """
+    Block until a request arrives, then keep collecting requests until
+    MAX_BATCH_SIZE is reached or MAX_WAIT_MS has passed
+    """
+    items = [batch_queue.get()]
+    deadline = time.monotonic() + MAX_WAIT_MS / 1000
+
+    while len(items) < MAX_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            items.append(batch_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
 
+    return items
+
+
+def batch_worker():
+    """Background loop that runs queued texts through the ensemble"""
+    while True:
+        with batch_lock:
+            items = drain_batch()
+
+        texts = [text for text, _ in items]
+
+        try:
+            results, complete = analyze_batch(texts)
         except Exception as e:
-            logging.error(f"Error with {model_name}: {str(e)}")
-            # If one model fails, continue with others
+            logging.error(f"Error in batch worker: {str(e)}")
+            for _, future in items:
+                future.set_exception(e)
             continue
 
-    # Average across models
-    num_models = len(models)
-    result = {
-        "positive": ensemble_positive / num_models,
-        "negative": ensemble_negative / num_models,
-        "neutral": ensemble_neutral / num_models,
-        "confidence": max_confidence / num_models,
-    }
+        # Results missing a model are served but not reused for later requests
+        if complete:
+            with sentiment_cache_lock:
+                for text, result in zip(texts, results):
+                    ensemble_cache[text_key(text)] = result
+
+        for (_, future), result in zip(items, results):
+            future.set_result(result)
+
+
+def ensure_batch_worker():
+    """
+    Start the batch worker in this process if it isn't running yet
+    Threads don't survive fork, so each gunicorn worker starts its own
+    """
+    global batch_worker_pid
+
+    if batch_worker_pid == os.getpid():
+        return
 
-    return result
+    with batch_worker_start_lock:
+        if batch_worker_pid != os.getpid():
+            threading.Thread(
+                target=batch_worker, name="batch-worker", daemon=True
+            ).start()
+            batch_worker_pid = os.getpid()
 
 
 @app.route("/analyze_single", methods=["POST"])
@@ -244,28 +745,31 @@ def analyze_single():
         if not data or "text" not in data:
             return jsonify({"error": "Missing 'text' field"}), 400
 
-        text = data["text"][:512]
+        text = data["text"]
+
+        if len(text) > MAX_TEXT_LENGTH:
+            return (
+                jsonify({"error": f"Text exceeds {MAX_TEXT_LENGTH} characters"}),
+                413,
+            )
 
         if not text.strip():
             return jsonify({"error": "Empty text"}), 400
 
-        # Use only FinBERT
-        model_dict = models["finbert"]
-        tokenizer = model_dict["tokenizer"]
-        model = model_dict["model"]
-
-        inputs = tokenizer(
-            text, return_tensors="pt", truncation=True, max_length=512, padding=True
-        ).to(device)
+        # Use only FinBERT, reusing the result for texts seen before
+        key = text_key(text)
+        with sentiment_cache_lock:
+            probabilities = finbert_cache.get(key)
 
-        with torch.no_grad():
-            outputs = model(**inputs)
-            probabilities = F.softmax(outputs.logits, dim=1)[0]
+        if probabilities is None:
+            probabilities = finbert_probabilities(text)
+            with sentiment_cache_lock:
+                finbert_cache[key] = probabilities
 
         result = {
-            "positive": float(probabilities[0]),
-            "negative": float(probabilities[1]),
-            "neutral": float(probabilities[2]),
+            "positive": probabilities[0],
+            "negative": probabilities[1],
+            "neutral": probabilities[2],
             "model": "finbert",
         }
 
@@ -277,5 +781,42 @@ def analyze_single():
         return jsonify({"error": str(e)}), 500
 
 
+def finbert_probabilities(text):
+    """FinBERT probabilities for a single text"""
+    if finbert_graphs:
+        return replay_finbert_graph(text)
+
+    # Run on the ensemble's threads so concurrent requests can't add more
+    # forward passes than the thread budget in gunicorn.conf.py allows for
+    probabilities = model_executor.submit(
+        model_probabilities, "finbert", [text]
+    ).result()
+    return probabilities[0].cpu().tolist()
+
+
+def replay_finbert_graph(text):
+    """
+    FinBERT probabilities via the smallest captured CUDA graph that fits the text
+    """
+    tokenizer = models["finbert"]["tokenizer"]
+    encoding = encode("finbert", text)
+    length = next(b for b in GRAPH_BUCKETS if b >= len(encoding["input_ids"]))
+    # Pad a list so the cached encoding isn't padded in place
+    inputs = tokenizer.pad(
+        [encoding], padding="max_length", max_length=length, return_tensors="pt"
+    )
+
+    graph, static_inputs, static_logits = finbert_graphs[length]
+    order = models["finbert"]["label_order"]
+
+    # Graph buffers are shared, so only one request can replay at a time
+    with graph_lock:
+        static_inputs["input_ids"].copy_(inputs["input_ids"])
+        static_inputs["attention_mask"].copy_(inputs["attention_mask"])
+        graph.replay()
+        probabilities = F.softmax(static_logits, dim=1)[0]
+        return probabilities.index_select(0, order).cpu().tolist()
+
+
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8000, debug=True, threaded=True)
+    app.run(host="0.0.0.0", port=8000, threaded=True)
@@ -0,0 +1,50 @@
+# Gunicorn settings for the NLP service
+# On CPU hosts the models load once in the master and are shared copy-on-write
+# with the forked workers, so each worker runs inference in its own process
+# without the GIL. CUDA can't be initialized before fork, so on GPU hosts
+# each worker loads its own models and only one worker runs by default.
+# ONNX Runtime thread pools don't survive fork either, so INFERENCE_BACKEND=onnx
+# also loads the models in each worker.
+# Each worker serves several requests on threads so the micro-batcher in app.py
+# can combine them into one forward pass.
+import os
+
+
+def cuda_available():
+    """
+    Whether this host has a GPU, checked through NVML so the master doesn't
+    create a CUDA context that the forked workers would inherit
+    """
+    os.environ.setdefault("PYTORCH_NVML_BASED_CUDA_CHECK", "1")
+    import torch
+
+    return torch.cuda.is_available()
+
+
+# USE_CUDA=0/1 overrides the detection
+if "USE_CUDA" in os.environ:
+    use_cuda = os.environ["USE_CUDA"] == "1"
+else:
+    use_cuda = cuda_available()
+
+bind = "0.0.0.0:8000"
+workers = int(os.environ.get("WEB_CONCURRENCY", 1 if use_cuda else 4))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+preload_app = not use_cuda and os.environ.get("INFERENCE_BACKEND") != "onnx"
+timeout = 120
+
+# Number of models in the app.py ensemble. Each worker runs up to this many
+# forward passes at once (one per executor thread), and each forward uses
+# TORCH_THREADS intra-op threads, so the CPU is used by
+# workers * ENSEMBLE_SIZE * TORCH_THREADS threads in total
+ENSEMBLE_SIZE = 2
+
+# Split the cores between those forwards so they don't oversubscribe the CPU
+raw_env = [
+    "TORCH_THREADS="
+    + os.environ.get(
+        "TORCH_THREADS",
+        str(max(1, (os.cpu_count() or 1) // (workers * ENSEMBLE_SIZE))),
+    )
+]
@@ -1,11 +1,44 @@
+import numpy as np
+import orjson
 import yfinance as yf
-from flask import Flask, request, jsonify
+from cachetools import TTLCache, cached
+from flask import Flask, Response, request, jsonify
 from datetime import datetime, timedelta
 import logging
+import threading
 
 app = Flask(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Yahoo responses are cached in-process to skip repeated network round-trips
+CACHE_TTL_SECONDS = 300
+
+
+@cached(TTLCache(maxsize=1024, ttl=CACHE_TTL_SECONDS), lock=threading.Lock())
+def fetch_info(ticker):
+    """Company info for a ticker, cached per ticker"""
+    return yf.Ticker(ticker).info
+
+
+history_cache = TTLCache(maxsize=1024, ttl=CACHE_TTL_SECONDS)
+history_cache_lock = threading.Lock()
+
+
+def fetch_history(ticker, start, end):
+    """Price history for a ticker, cached per (ticker, start, end) window"""
+    key = (ticker, start, end)
+    with history_cache_lock:
+        hist = history_cache.get(key)
+
+    if hist is None:
+        hist = yf.Ticker(ticker).history(start=start, end=end)
+        # yfinance returns an empty frame on network errors, so only cache data
+        if not hist.empty:
+            with history_cache_lock:
+                history_cache[key] = hist
+
+    return hist
+
 
 @app.route("/health", methods=["GET"])
 def health():
@@ -23,27 +56,24 @@ def get_stock_data():
 
         logging.info(f"Fetching {ticker} from {start_date} to {end_date}")
 
-        stock = yf.Ticker(ticker)
-        hist = stock.history(start=start_date, end=end_date)
+        hist = fetch_history(ticker, start_date, end_date)
 
         if hist.empty:
             return jsonify({"error": f"No data found for {ticker}"}), 404
 
-        result = []
-        for date, row in hist.iterrows():
-            result.append(
-                {
-                    "date": date.strftime("%Y-%m-%d"),
-                    "open": float(row["Open"]),
-                    "close": float(row["Close"]),
-                    "high": float(row["High"]),
-                    "low": float(row["Low"]),
-                    "volume": int(row["Volume"]),
-                }
-            )
+        # Convert whole columns at once instead of boxing every cell per row
+        records = hist.rename(columns=str.lower)
+        records["date"] = hist.index.strftime("%Y-%m-%d")
+        records["volume"] = records["volume"].astype("int64")
+        result = records[["date", "open", "close", "high", "low", "volume"]].to_dict(
+            orient="records"
+        )
 
         logging.info(f"Returned {len(result)} data points for {ticker}")
-        return jsonify(result)
+        return Response(
+            orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY),
+            mimetype="application/json",
+        )
 
     except Exception as e:
         logging.error(f"Error: {str(e)}")
@@ -59,23 +89,20 @@ def get_stock_price():
         date = data["date"]  # Format: YYYY-MM-DD
 
         # Fetch data around the date (in case market was closed)
-        stock = yf.Ticker(ticker)
         start = datetime.strptime(date, "%Y-%m-%d") - timedelta(days=5)
         end = datetime.strptime(date, "%Y-%m-%d") + timedelta(days=5)
 
-        hist = stock.history(
-            start=start.strftime("%Y-%m-%d"), end=end.strftime("%Y-%m-%d")
+        hist = fetch_history(
+            ticker, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
         )
 
         if hist.empty:
             return jsonify({"error": f"No data for {ticker} on {date}"}), 404
 
-        # Get closest date
-        target_date = datetime.strptime(date, "%Y-%m-%d")
-        closest_idx = min(
-            range(len(hist)),
-            key=lambda i: abs((hist.index[i].to_pydatetime() - target_date).days),
-        )
+        # Get closest date, comparing calendar days in the exchange's timezone
+        target_date = np.datetime64(date, "D")
+        trading_days = hist.index.tz_localize(None).values.astype("datetime64[D]")
+        closest_idx = int(np.abs(trading_days - target_date).argmin())
 
         row = hist.iloc[closest_idx]
 
@@ -103,8 +130,7 @@ def get_company_info():
         data = request.get_json()
         ticker = data["ticker"]
 
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        info = fetch_info(ticker)
 
         result = {
             "ticker": ticker,
@@ -0,0 +1,5 @@
+# WSGI entry point for running the NLP service under gunicorn:
+#   gunicorn -c gunicorn.conf.py wsgi:app
+# GPU hosts are detected automatically and skip preloading the models before
+# fork; set USE_CUDA=0 or USE_CUDA=1 to override the detection.
+from app import app